@@ -3,13 +3,20 @@ KDP Book Formatter Web Application
 A Flask-based tool for formatting manuscripts according to Amazon KDP standards.
 """
 
+import json
+import mimetypes
 import os
+import re
+import tempfile
+import threading
+import time
 import uuid
-from flask import Flask, render_template, request, send_file, redirect, url_for, flash, session, make_response, send_from_directory
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from flask import Flask, Request, render_template, request, send_file, redirect, url_for, flash, session, make_response, send_from_directory
 from werkzeug.utils import secure_filename
 
-from services.formatter import format_manuscript
-from services.pdf_exporter import convert_to_pdf, is_pdf_conversion_available
+from services.pdf_exporter import convert_to_pdf, is_pdf_conversion_available, start_libreoffice_server
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SESSION_SECRET', 'dev-secret-key-change-in-production')
@@ -19,14 +26,99 @@ ALLOWED_EXTENSIONS = {'docx'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
+app.config['UPLOAD_MAX_AGE'] = int(os.environ.get('UPLOAD_MAX_AGE_HOURS', '24')) * 3600
+app.config['UPLOAD_SWEEP_INTERVAL'] = 15 * 60
+# Hand file downloads to the front-end server instead of streaming them
+# through Python: X-Sendfile (Apache/lighttpd) or X-Accel-Redirect (nginx,
+# set to the internal location that maps to UPLOAD_FOLDER).
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
+class UploadRequest(Request):
+    """Request that spools uploaded files straight into the upload folder."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.NamedTemporaryFile('wb+', dir=UPLOAD_FOLDER, prefix='upload_', suffix='.part')
+
+
+app.request_class = UploadRequest
+
+RESULT_ID_PATTERN = re.compile(r'^[0-9a-f]{8}$')
+
+# Single background thread for file deletions, so slow storage never
+# delays a response
+cleanup_executor = ThreadPoolExecutor(max_workers=1)
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def sweep_uploads():
+    """Delete files in the upload folder older than UPLOAD_MAX_AGE."""
+    cutoff = time.time() - app.config['UPLOAD_MAX_AGE']
+    
+    with os.scandir(app.config['UPLOAD_FOLDER']) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def schedule_upload_sweep():
+    """Queue a sweep of stale uploads at most once per UPLOAD_SWEEP_INTERVAL."""
+    global _last_sweep
+    
+    with _sweep_lock:
+        now = time.monotonic()
+        if _last_sweep and now - _last_sweep < app.config['UPLOAD_SWEEP_INTERVAL']:
+            return
+        _last_sweep = now
+    
+    cleanup_executor.submit(sweep_uploads)
+
+
+def _result_path(result_id):
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"result_{result_id}.json")
+
+
+def save_result(result_id, result):
+    """Store processing results on disk, keyed by result ID."""
+    with open(_result_path(result_id), 'w') as f:
+        json.dump(result, f)
+
+
+def load_result(result_id):
+    """
+    Load processing results for the current session.
+    
+    Returns:
+        Result dictionary, or None if missing or owned by another session
+    """
+    if not RESULT_ID_PATTERN.match(result_id) or session.get('result_id') != result_id:
+        return None
+    
+    try:
+        with open(_result_path(result_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
 @app.route('/')
 def index():
     """Display the upload page."""
@@ -89,7 +181,19 @@ def process():
     input_path = os.path.join(app.config['UPLOAD_FOLDER'], input_filename)
     output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
     
-    file.save(input_path)
+    # The upload is already on disk in UPLOAD_FOLDER; link it into place
+    # rather than copying it. The temporary name is removed when the
+    # request closes the stream. Fall back to a copy where hard links
+    # are unsupported.
+    file.stream.flush()
+    try:
+        os.link(file.stream.name, input_path)
+    except OSError:
+        file.stream.seek(0)
+        file.save(input_path)
+    
+    # Imported here so python-docx and lxml load on first use, not at startup
+    from services.formatter import format_manuscript
     
     result = format_manuscript(
         input_path=input_path,
@@ -101,6 +205,9 @@ def process():
         line_spacing=line_spacing
     )
     
+    cleanup_executor.submit(_remove_file, input_path)
+    schedule_upload_sweep()
+    
     if not result['success']:
         flash(f"Formatting failed: {result.get('error', 'Unknown error')}", 'error')
         return redirect(url_for('index'))
@@ -115,7 +222,7 @@ def process():
         else:
             pdf_error = pdf_result
     
-    session['result'] = {
+    save_result(unique_id, {
         'docx_path': output_path,
         'docx_filename': output_filename,
         'pdf_path': pdf_path,
@@ -126,31 +233,27 @@ def process():
         'author': author,
         'trim_size': trim_size,
         'print_mode': print_mode
-    }
+    })
+    session['result_id'] = unique_id
     
-    try:
-        os.remove(input_path)
-    except:
-        pass
-    
-    return redirect(url_for('results'))
+    return redirect(url_for('results', result_id=unique_id))
 
 
-@app.route('/results')
-def results():
+@app.route('/results/<result_id>')
+def results(result_id):
     """Display processing results."""
-    result = session.get('result')
+    result = load_result(result_id)
     if not result:
         flash('No processing results found', 'error')
         return redirect(url_for('index'))
     
-    return render_template('results.html', result=result)
+    return render_template('results.html', result=result, result_id=result_id)
 
 
-@app.route('/download/<file_type>')
-def download(file_type):
+@app.route('/download/<result_id>/<file_type>')
+def download(result_id, file_type):
     """Download the processed file."""
-    result = session.get('result')
+    result = load_result(result_id)
     if not result:
         flash('No file available for download', 'error')
         return redirect(url_for('index'))
@@ -163,11 +266,19 @@ def download(file_type):
         filename = result.get('pdf_filename')
     else:
         flash('Invalid file type', 'error')
-        return redirect(url_for('results'))
+        return redirect(url_for('results', result_id=result_id))
     
     if not file_path or not os.path.exists(file_path):
         flash('File not found', 'error')
-        return redirect(url_for('results'))
+        return redirect(url_for('results', result_id=result_id))
+    
+    accel_prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+    if accel_prefix:
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(os.path.basename(file_path))}"
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.headers.set('Content-Disposition', 'attachment', filename=filename)
+        return response
     
     return send_file(
         file_path,
@@ -186,4 +297,8 @@ def add_cache_headers(response):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    # With the reloader, only the child process serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_libreoffice_server()
+    app.run(host='0.0.0.0', port=5000, debug=debug)
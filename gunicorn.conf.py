@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for production deployments.
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Formatting is CPU-bound, so scale worker processes with the CPU count
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = 4
+
+# Load the app once in the master; when_ready below also imports the
+# formatter (python-docx and lxml) so those pages are shared copy-on-write
+# across forked workers. Pillow stays lazy: it is only needed for images
+# the DPI header parser cannot read.
+preload_app = True
+
+# PDF conversion can take a while on large manuscripts
+timeout = 180
+
+
+def when_ready(server):
+    """
+    Load the lazily imported formatter and start the warm LibreOffice
+    server in the master, before workers are forked.
+    """
+    import services.formatter
+    from services.pdf_exporter import start_libreoffice_server
+    
+    start_libreoffice_server()
@@ -3,17 +3,29 @@ DPI Checker Service
 Inspects embedded images in DOCX files and checks for minimum DPI requirements.
 """
 
-import io
-import zipfile
-from PIL import Image
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
 
 
-def check_image_dpi(docx_path, min_dpi=300):
+IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'tif', 'webp'})
+
+HEADER_BYTES = 64 * 1024
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+JPEG_SOF_MARKERS = frozenset({
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF
+})
+
+
+def check_image_dpi(docx_zip, min_dpi=300):
     """
     Check all embedded images in a DOCX file for DPI compliance.
     
     Args:
-        docx_path: Path to the DOCX file
+        docx_zip: Open zipfile.ZipFile of the DOCX file
         min_dpi: Minimum acceptable DPI (default 300 for print)
     
     Returns:
@@ -22,43 +34,18 @@ def check_image_dpi(docx_path, min_dpi=300):
     warnings = []
     
     try:
-        with zipfile.ZipFile(docx_path, 'r') as docx_zip:
-            for file_name in docx_zip.namelist():
-                if file_name.startswith('word/media/') and _is_image_file(file_name):
-                    try:
-                        image_data = docx_zip.read(file_name)
-                        image = Image.open(io.BytesIO(image_data))
-                        
-                        dpi_x, dpi_y = image.info.get('dpi', (72, 72))
-                        
-                        if isinstance(dpi_x, tuple):
-                            dpi_x = dpi_x[0]
-                        if isinstance(dpi_y, tuple):
-                            dpi_y = dpi_y[0]
-                        
-                        dpi_x = int(dpi_x) if dpi_x else 72
-                        dpi_y = int(dpi_y) if dpi_y else 72
-                        
-                        avg_dpi = (dpi_x + dpi_y) // 2
-                        
-                        if avg_dpi < min_dpi:
-                            warnings.append({
-                                'image': file_name.split('/')[-1],
-                                'dpi': avg_dpi,
-                                'required': min_dpi,
-                                'width': image.width,
-                                'height': image.height,
-                                'message': f"Image '{file_name.split('/')[-1]}' has {avg_dpi} DPI (minimum {min_dpi} DPI required for print)"
-                            })
-                        
-                        image.close()
-                    except Exception as e:
-                        warnings.append({
-                            'image': file_name.split('/')[-1],
-                            'dpi': 'Unknown',
-                            'required': min_dpi,
-                            'message': f"Could not analyze image '{file_name.split('/')[-1]}': {str(e)}"
-                        })
+        media_names = [
+            name for name in docx_zip.namelist()
+            if name.startswith('word/media/') and _is_image_file(name)
+        ]
+        
+        max_workers = min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda name: _inspect_image(docx_zip, name, min_dpi),
+                media_names
+            )
+            warnings.extend(warning for warning in results if warning)
     except Exception as e:
         warnings.append({
             'image': 'N/A',
@@ -70,7 +57,147 @@ def check_image_dpi(docx_path, min_dpi=300):
     return warnings
 
 
+def _inspect_image(docx_zip, file_name, min_dpi):
+    """
+    Check a single embedded image for DPI compliance.
+    
+    PNG and JPEG headers are parsed directly; PIL is only used for other
+    formats or headers the fast path cannot resolve.
+    
+    Returns:
+        Warning dictionary, or None if the image meets the minimum DPI
+    """
+    image_name = file_name.split('/')[-1]
+    
+    try:
+        with docx_zip.open(file_name, 'r') as image_stream:
+            header_info = _read_header_info(image_stream.read(HEADER_BYTES))
+            
+            if header_info is None:
+                from PIL import Image
+                
+                image_stream.seek(0)
+                with Image.open(image_stream) as image:
+                    dpi_x, dpi_y = image.info.get('dpi', (72, 72))
+                    width, height = image.size
+            else:
+                dpi_x, dpi_y, width, height = header_info
+        
+        if isinstance(dpi_x, tuple):
+            dpi_x = dpi_x[0]
+        if isinstance(dpi_y, tuple):
+            dpi_y = dpi_y[0]
+        
+        dpi_x = round(dpi_x) if dpi_x else 72
+        dpi_y = round(dpi_y) if dpi_y else 72
+        
+        avg_dpi = (dpi_x + dpi_y) // 2
+        
+        if avg_dpi < min_dpi:
+            return {
+                'image': image_name,
+                'dpi': avg_dpi,
+                'required': min_dpi,
+                'width': width,
+                'height': height,
+                'message': f"Image '{image_name}' has {avg_dpi} DPI (minimum {min_dpi} DPI required for print)"
+            }
+    except Exception as e:
+        return {
+            'image': image_name,
+            'dpi': 'Unknown',
+            'required': min_dpi,
+            'message': f"Could not analyze image '{image_name}': {str(e)}"
+        }
+    
+    return None
+
+
+def _read_header_info(header):
+    """
+    Read DPI and pixel size from the start of a PNG or JPEG file.
+    
+    Returns:
+        Tuple of (dpi_x, dpi_y, width, height), with DPI None when the file
+        declares none, or None if the header cannot be resolved here
+    """
+    if header.startswith(PNG_SIGNATURE):
+        return _read_png_header(header)
+    if header.startswith(b'\xff\xd8'):
+        return _read_jpeg_header(header)
+    return None
+
+
+def _read_png_header(header):
+    """Read DPI from the pHYs chunk and size from IHDR."""
+    if len(header) < 24 or header[12:16] != b'IHDR':
+        return None
+    
+    width, height = struct.unpack('>II', header[16:24])
+    
+    offset = 8
+    while offset + 8 <= len(header):
+        length, chunk_type = struct.unpack('>I4s', header[offset:offset + 8])
+        
+        if chunk_type == b'pHYs':
+            data = header[offset + 8:offset + 17]
+            if len(data) < 9:
+                return None
+            
+            ppu_x, ppu_y, unit = struct.unpack('>IIB', data)
+            if unit == 1:
+                return ppu_x * 0.0254, ppu_y * 0.0254, width, height
+            return None, None, width, height
+        
+        # pHYs must precede image data, so reaching IDAT means there is none
+        if chunk_type in (b'IDAT', b'IEND'):
+            return None, None, width, height
+        
+        offset += length + 12
+    
+    return None
+
+
+def _read_jpeg_header(header):
+    """Read DPI from the JFIF APP0 segment and size from the SOF segment."""
+    dpi = None
+    
+    offset = 2
+    while offset + 4 <= len(header):
+        if header[offset] != 0xFF:
+            return None
+        
+        marker = header[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        
+        length = struct.unpack('>H', header[offset + 2:offset + 4])[0]
+        segment = header[offset + 4:offset + 2 + length]
+        
+        if marker == 0xE0 and segment.startswith(b'JFIF\x00') and len(segment) >= 12:
+            unit, density_x, density_y = struct.unpack('>BHH', segment[7:12])
+            if unit == 1:
+                dpi = (density_x, density_y)
+            elif unit == 2:
+                dpi = (density_x * 2.54, density_y * 2.54)
+        
+        elif marker in JPEG_SOF_MARKERS:
+            # Without JFIF units PIL falls back to EXIF resolution
+            if dpi is None or len(segment) < 5:
+                return None
+            
+            height, width = struct.unpack('>HH', segment[1:5])
+            return dpi[0], dpi[1], width, height
+        
+        elif marker == 0xDA:
+            return None
+        
+        offset += 2 + length
+    
+    return None
+
+
 def _is_image_file(filename):
     """Check if file is an image based on extension."""
-    image_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif', '.webp')
-    return filename.lower().endswith(image_extensions)
+    return filename.rpartition('.')[2].lower() in IMAGE_EXTENSIONS
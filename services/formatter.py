@@ -3,16 +3,21 @@ KDP Formatter Service
 Main formatting logic for KDP-standard manuscript preparation.
 """
 
+import io
+import mmap
+import os
 import re
+import zipfile
 from docx import Document
-from docx.shared import Pt, Inches, Twips
+from docx.shared import Emu, Pt, Inches, Twips
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
 from docx.enum.section import WD_ORIENT
 from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import qn, nsmap
 from docx.oxml import OxmlElement
+from docx.styles import BabelFish
 
-from services.frontmatter import insert_front_matter
+from services.frontmatter import insert_front_matter, set_run_font
 from services.dpi_checker import check_image_dpi
 
 
@@ -29,6 +34,12 @@ MARGINS = {
     'outside': Inches(0.6)
 }
 
+BODY_STYLES = {'Normal', 'Body Text', 'Body'}
+
+_RE_SPACES = re.compile(r' {2,}')
+_RE_NEWLINES = re.compile(r'\n{3,}')
+_TAB_TABLE = str.maketrans('\t', ' ')
+
 
 def format_manuscript(input_path, output_path, trim_size='6x9', print_mode=False, 
                       title="Untitled", author="Author Name", line_spacing=1.15):
@@ -48,23 +59,28 @@ def format_manuscript(input_path, output_path, trim_size='6x9', print_mode=False
         Dictionary with status and any warnings
     """
     try:
-        doc = Document(input_path)
-        
-        dpi_warnings = check_image_dpi(input_path)
+        fd = os.open(input_path, os.O_RDONLY)
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as docx_map:
+                docx_file = _MappedFile(docx_map)
+                
+                with zipfile.ZipFile(docx_file, 'r') as docx_zip:
+                    dpi_warnings = check_image_dpi(docx_zip)
+                
+                docx_file.seek(0)
+                doc = Document(docx_file)
+        finally:
+            os.close(fd)
         
         _setup_page_dimensions(doc, trim_size, print_mode)
         
         _setup_styles(doc, line_spacing)
         
-        _cleanup_text(doc)
-        
-        _format_chapters(doc)
-        
-        _apply_body_formatting(doc, line_spacing)
+        _apply_all_paragraph_passes(doc, line_spacing)
         
-        insert_front_matter(doc, title, author)
+        front_matter_len = insert_front_matter(doc, title, author)
         
-        _insert_toc(doc)
+        _insert_toc(doc, front_matter_len)
         
         doc.save(output_path)
         
@@ -83,6 +99,34 @@ def format_manuscript(input_path, output_path, trim_size='6x9', print_mode=False
         }
 
 
+class _MappedFile(io.RawIOBase):
+    """Read-only file interface over an mmap, as zipfile expects."""
+    
+    def __init__(self, mapped):
+        self._mapped = mapped
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def read(self, size=-1):
+        return self._mapped.read(size)
+    
+    def readinto(self, buffer):
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+    
+    def tell(self):
+        return self._mapped.tell()
+
+
 def _setup_page_dimensions(doc, trim_size, print_mode):
     """Configure page size and margins."""
     size = TRIM_SIZES.get(trim_size, TRIM_SIZES['6x9'])
@@ -135,113 +179,128 @@ def _setup_styles(doc, line_spacing):
     heading1_style.paragraph_format.page_break_before = True
 
 
-def _cleanup_text(doc):
-    """Remove extra spaces, tabs, and multiple line breaks."""
-    for para in doc.paragraphs:
-        for run in para.runs:
-            if run.text:
-                text = run.text
-                text = text.replace('\t', ' ')
-                text = re.sub(r' {2,}', ' ', text)
-                text = re.sub(r'\n{3,}', '\n\n', text)
-                run.text = text
-
-
-def _format_chapters(doc):
-    """Format chapter headings with page breaks and center alignment."""
-    for para in doc.paragraphs:
-        if para.style and para.style.name == 'Heading 1':
-            para.paragraph_format.page_break_before = True
-            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+def _apply_all_paragraph_passes(doc, line_spacing):
+    """
+    Clean up text and apply heading and body formatting in one pass.
+    
+    Removes extra spaces, tabs, and multiple line breaks from every run,
+    formats chapter headings with page breaks and center alignment, and
+    applies body text formatting to regular paragraphs. Works on the
+    w:p/w:r elements directly rather than python-docx wrapper objects.
+    """
+    style_names, default_style_name = _paragraph_style_names(doc)
+    
+    for p in doc.element.body.xpath('./w:p'):
+        style_ids = p.xpath('./w:pPr/w:pStyle/@w:val')
+        if style_ids:
+            style_name = style_names.get(style_ids[0], default_style_name)
+        else:
+            style_name = default_style_name
+        runs = p.xpath('./w:r')
+        
+        for r in runs:
+            _cleanup_run(r)
+        
+        if style_name == 'Heading 1':
+            pPr = p.get_or_add_pPr()
+            pPr.pageBreakBefore_val = True
+            pPr.jc_val = WD_ALIGN_PARAGRAPH.CENTER
             
-            for run in para.runs:
-                run.font.name = 'Georgia'
-                run.font.size = Pt(18)
-                run.bold = True
-
-
-def _apply_body_formatting(doc, line_spacing):
-    """Apply body text formatting to all regular paragraphs."""
-    for para in doc.paragraphs:
-        if para.style and para.style.name in ['Normal', 'Body Text', 'Body']:
-            para.paragraph_format.line_spacing = line_spacing
-            para.paragraph_format.space_after = Pt(6)
-            para.paragraph_format.first_line_indent = Inches(0.25)
+            for r in runs:
+                set_run_font(r, Pt(18), bold=True)
+        
+        elif style_name in BODY_STYLES:
+            pPr = p.get_or_add_pPr()
+            pPr.spacing_line = Emu(line_spacing * Twips(240))
+            pPr.spacing_lineRule = WD_LINE_SPACING.MULTIPLE
+            pPr.spacing_after = Pt(6)
+            pPr.first_line_indent = Inches(0.25)
             
-            for run in para.runs:
-                run.font.name = 'Georgia'
-                run.font.size = Pt(11)
+            for r in runs:
+                set_run_font(r, Pt(11))
 
 
-def _insert_toc(doc):
-    """Insert a Word-compatible dynamic table of contents."""
-    body = doc.element.body
+def _paragraph_style_names(doc):
+    """
+    Map paragraph style IDs to style names, plus the default style name.
+    Reads styles.xml directly instead of building python-docx Style objects.
+    """
+    style_names = {}
+    default_style_name = None
+    
+    for style in doc.styles.element.iter(qn('w:style')):
+        if style.get(qn('w:type'), 'paragraph') != 'paragraph':
+            continue
+        
+        names = style.xpath('./w:name/@w:val')
+        name = BabelFish.internal2ui(names[0]) if names else None
+        style_names[style.get(qn('w:styleId'))] = name
+        
+        if style.get(qn('w:default')) in ('1', 'true', 'on'):
+            default_style_name = name
     
-    toc_elements = []
+    return style_names, default_style_name
+
+
+def _cleanup_run(r):
+    """Remove extra spaces, tabs, and multiple line breaks from a w:r element."""
+    original = r.text
+    if not original or not ('\t' in original or '  ' in original or '\n\n\n' in original):
+        return
     
-    toc_title = doc.add_paragraph()
-    toc_title_run = toc_title.add_run("Table of Contents")
-    toc_title_run.bold = True
-    toc_title_run.font.size = Pt(18)
-    toc_title_run.font.name = 'Georgia'
-    toc_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    toc_elements.append(toc_title._element)
+    text = original.translate(_TAB_TABLE)
+    text = _RE_SPACES.sub(' ', text)
+    text = _RE_NEWLINES.sub('\n\n', text)
     
-    spacer = doc.add_paragraph()
-    toc_elements.append(spacer._element)
+    # Rewriting the run rebuilds its content elements, so only do it on change
+    if text != original:
+        r.text = text
+
+
+def _insert_toc(doc, insert_position):
+    """Insert a Word-compatible dynamic table of contents at insert_position."""
+    body = doc.element.body
     
-    toc_para = doc.add_paragraph()
-    toc_elements.append(toc_para._element)
+    toc_title = OxmlElement('w:p')
+    toc_title_run = toc_title.add_r()
+    toc_title_run.text = "Table of Contents"
+    set_run_font(toc_title_run, Pt(18), bold=True)
+    toc_title.get_or_add_pPr().jc_val = WD_ALIGN_PARAGRAPH.CENTER
     
+    spacer = OxmlElement('w:p')
+    
+    toc_para = OxmlElement('w:p')
     _add_toc_field(toc_para)
     
-    page_break_para = doc.add_paragraph()
-    run = page_break_para.add_run()
+    page_break_para = OxmlElement('w:p')
     br = OxmlElement('w:br')
     br.set(qn('w:type'), 'page')
-    run._element.append(br)
-    toc_elements.append(page_break_para._element)
-    
-    front_matter_count = 0
-    for i, element in enumerate(body):
-        if element.tag.endswith('}p'):
-            front_matter_count += 1
-            if front_matter_count > 30:
-                break
+    page_break_para.add_r().append(br)
     
-    insert_position = min(front_matter_count, len(body) - 1)
+    toc_elements = [toc_title, spacer, toc_para, page_break_para]
     
-    for element in reversed(toc_elements):
-        if insert_position < len(body):
-            body.insert(insert_position, element)
-        else:
-            body.append(element)
+    body[insert_position:insert_position] = toc_elements
 
 
-def _add_toc_field(paragraph):
-    """Add TOC field codes to a paragraph for Word compatibility."""
-    run = paragraph.add_run()
-    
+def _add_toc_field(p):
+    """Add TOC field codes to a w:p element for Word compatibility."""
     fldChar_begin = OxmlElement('w:fldChar')
     fldChar_begin.set(qn('w:fldCharType'), 'begin')
-    run._element.append(fldChar_begin)
+    p.add_r().append(fldChar_begin)
     
-    run2 = paragraph.add_run()
     instrText = OxmlElement('w:instrText')
     instrText.set(qn('xml:space'), 'preserve')
     instrText.text = ' TOC \\o "1-3" \\h \\z \\u '
-    run2._element.append(instrText)
+    p.add_r().append(instrText)
     
-    run3 = paragraph.add_run()
     fldChar_separate = OxmlElement('w:fldChar')
     fldChar_separate.set(qn('w:fldCharType'), 'separate')
-    run3._element.append(fldChar_separate)
+    p.add_r().append(fldChar_separate)
     
-    run4 = paragraph.add_run("Right-click and select 'Update Field' to generate TOC")
-    run4.italic = True
-    run4.font.size = Pt(10)
+    placeholder_run = p.add_r()
+    placeholder_run.text = "Right-click and select 'Update Field' to generate TOC"
+    set_run_font(placeholder_run, Pt(10), italic=True, font_name=None)
     
-    run5 = paragraph.add_run()
     fldChar_end = OxmlElement('w:fldChar')
     fldChar_end.set(qn('w:fldCharType'), 'end')
-    run5._element.append(fldChar_end)
+    p.add_r().append(fldChar_end)
@@ -22,76 +22,42 @@ def insert_front_matter(doc, title="Untitled", author="Author Name"):
         author: Author name
     
     Returns:
-        Modified Document object
+        Number of elements inserted, i.e. the body index just past the front matter
     """
     body = doc.element.body
-    first_element = body[0] if len(body) > 0 else None
     
-    front_matter_elements = []
+    front_matter_elements = (
+        _create_title_page(title, author)
+        + _create_copyright_page(title, author)
+        + _create_dedication_page()
+    )
     
-    title_elements = _create_title_page(doc, title, author)
-    front_matter_elements.extend(title_elements)
+    body[0:0] = front_matter_elements
     
-    copyright_elements = _create_copyright_page(doc, title, author)
-    front_matter_elements.extend(copyright_elements)
-    
-    dedication_elements = _create_dedication_page(doc)
-    front_matter_elements.extend(dedication_elements)
-    
-    for element in reversed(front_matter_elements):
-        if first_element is not None:
-            first_element.addprevious(element)
-        else:
-            body.append(element)
-    
-    return doc
+    return len(front_matter_elements)
 
 
-def _create_title_page(doc, title, author):
+def _create_title_page(title, author):
     """Create title page elements."""
-    elements = []
-    
-    for _ in range(8):
-        p = doc.add_paragraph()
-        elements.append(p._element)
-    
-    title_para = doc.add_paragraph()
-    title_run = title_para.add_run(title)
-    title_run.bold = True
-    title_run.font.size = Pt(36)
-    title_run.font.name = 'Georgia'
-    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    elements.append(title_para._element)
-    
-    spacer = doc.add_paragraph()
-    elements.append(spacer._element)
-    spacer2 = doc.add_paragraph()
-    elements.append(spacer2._element)
-    
-    author_para = doc.add_paragraph()
-    author_run = author_para.add_run(author)
-    author_run.font.size = Pt(18)
-    author_run.font.name = 'Georgia'
-    author_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    elements.append(author_para._element)
-    
-    page_break = doc.add_paragraph()
-    run = page_break.add_run()
-    run._element.append(_create_page_break())
-    elements.append(page_break._element)
+    elements = [_new_empty_p() for _ in range(8)]
+    
+    elements.append(_new_text_p(title, Pt(36), bold=True))
+    
+    elements.append(_new_empty_p())
+    elements.append(_new_empty_p())
+    
+    elements.append(_new_text_p(author, Pt(18)))
+    
+    elements.append(_new_page_break_p())
     
     return elements
 
 
-def _create_copyright_page(doc, title, author):
+def _create_copyright_page(title, author):
     """Create copyright page elements."""
-    elements = []
+    elements = [_new_empty_p() for _ in range(6)]
     current_year = datetime.now().year
     
-    for _ in range(6):
-        p = doc.add_paragraph()
-        elements.append(p._element)
-    
     copyright_text = f"""Copyright © {current_year} {author}
 
 All rights reserved.
@@ -105,45 +71,70 @@ First Edition
 Printed in the United States of America"""
 
     for line in copyright_text.split('\n'):
-        para = doc.add_paragraph()
-        run = para.add_run(line)
-        run.font.size = Pt(10)
-        run.font.name = 'Georgia'
-        para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        elements.append(para._element)
-    
-    page_break = doc.add_paragraph()
-    run = page_break.add_run()
-    run._element.append(_create_page_break())
-    elements.append(page_break._element)
+        elements.append(_new_text_p(line, Pt(10)))
+    
+    elements.append(_new_page_break_p())
     
     return elements
 
 
-def _create_dedication_page(doc):
+def _create_dedication_page():
     """Create dedication page elements."""
-    elements = []
+    elements = [_new_empty_p() for _ in range(10)]
     
-    for _ in range(10):
-        p = doc.add_paragraph()
-        elements.append(p._element)
+    elements.append(_new_text_p("For someone special…", Pt(14), italic=True))
     
-    dedication_para = doc.add_paragraph()
-    dedication_run = dedication_para.add_run("For someone special…")
-    dedication_run.italic = True
-    dedication_run.font.size = Pt(14)
-    dedication_run.font.name = 'Georgia'
-    dedication_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    elements.append(dedication_para._element)
-    
-    page_break = doc.add_paragraph()
-    run = page_break.add_run()
-    run._element.append(_create_page_break())
-    elements.append(page_break._element)
+    elements.append(_new_page_break_p())
     
     return elements
 
 
+def set_run_font(r, size, bold=False, italic=False, font_name='Georgia'):
+    """
+    Apply font, size and emphasis to a w:r element.
+    
+    Args:
+        r: CT_R run element
+        size: Font size as a Length (e.g. Pt(11))
+        bold: Turn bold on
+        italic: Turn italic on
+        font_name: Font family, or None to leave the run's font unchanged
+    """
+    rPr = r.get_or_add_rPr()
+    if bold:
+        rPr._set_bool_val('b', True)
+    if italic:
+        rPr._set_bool_val('i', True)
+    if font_name:
+        rPr.rFonts_ascii = font_name
+        rPr.rFonts_hAnsi = font_name
+    rPr.sz_val = size
+
+
+def _new_empty_p():
+    """Create a detached, empty paragraph element."""
+    return OxmlElement('w:p')
+
+
+def _new_text_p(text, size, bold=False, italic=False):
+    """Create a detached, centered Georgia paragraph element holding text."""
+    p = OxmlElement('w:p')
+    p.get_or_add_pPr().jc_val = WD_ALIGN_PARAGRAPH.CENTER
+    
+    r = p.add_r()
+    r.text = text
+    set_run_font(r, size, bold=bold, italic=italic)
+    
+    return p
+
+
+def _new_page_break_p():
+    """Create a detached paragraph element holding a page break."""
+    p = OxmlElement('w:p')
+    p.add_r().append(_create_page_break())
+    return p
+
+
 def _create_page_break():
     """Create a page break XML element."""
     br = OxmlElement('w:br')
@@ -2,18 +2,31 @@
 PDF Exporter Service
 Converts DOCX files to PDF using available methods.
 Primary: docx2pdf (faster, Windows-compatible)
-Fallback: LibreOffice headless CLI
+Fallback: warm LibreOffice server via unoserver, then LibreOffice headless CLI
 """
 
+import atexit
+import functools
 import os
+import shutil
 import subprocess
+import threading
 import uuid
 
 
+UNOSERVER_HOST = '127.0.0.1'
+UNOSERVER_PORT = '2003'
+
+_unoserver_process = None
+_unoserver_owner_pid = None
+_unoserver_lock = threading.Lock()
+
+
 def convert_to_pdf(docx_path, output_dir):
     """
     Convert a DOCX file to PDF.
-    Tries docx2pdf first, falls back to LibreOffice if unavailable.
+    Tries docx2pdf first, then the warm LibreOffice server, and finally
+    a one-shot LibreOffice process.
     
     Args:
         docx_path: Path to the DOCX file
@@ -31,12 +44,21 @@ def convert_to_pdf(docx_path, output_dir):
     
     docx2pdf_error = result
     
+    success, result = _convert_with_unoserver(docx_path, pdf_path)
+    if success:
+        return True, result
+    
+    unoserver_error = result
+    
     success, result = _convert_with_libreoffice(docx_path, output_dir, pdf_filename)
     if success:
         return True, result
     
     libreoffice_error = result
-    return False, f"PDF conversion failed. docx2pdf: {docx2pdf_error}. LibreOffice: {libreoffice_error}"
+    return False, (
+        f"PDF conversion failed. docx2pdf: {docx2pdf_error}. "
+        f"unoserver: {unoserver_error}. LibreOffice: {libreoffice_error}"
+    )
 
 
 def _convert_with_docx2pdf(docx_path, pdf_path):
@@ -72,6 +94,107 @@ def _convert_with_docx2pdf(docx_path, pdf_path):
         return False, f"docx2pdf error: {error_msg}", 'docx2pdf'
 
 
+def start_libreoffice_server():
+    """
+    Start a persistent LibreOffice instance through unoserver.
+    Keeps soffice warm so conversions skip its startup cost.
+    
+    Returns:
+        True if the server is running, False if unoserver is unavailable
+    """
+    global _unoserver_process, _unoserver_owner_pid
+    
+    with _unoserver_lock:
+        if _is_unoserver_running():
+            return True
+        
+        if shutil.which('unoserver') is None:
+            return False
+        
+        try:
+            _unoserver_process = subprocess.Popen(
+                ['unoserver', '--interface', UNOSERVER_HOST, '--port', UNOSERVER_PORT],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            _unoserver_process = None
+            return False
+        
+        _unoserver_owner_pid = os.getpid()
+        atexit.register(_stop_libreoffice_server)
+        return True
+
+
+def _stop_libreoffice_server():
+    """Terminate the persistent LibreOffice server if it is running."""
+    global _unoserver_process
+    
+    # Forked workers inherit the handle but must not stop the shared server
+    if os.getpid() != _unoserver_owner_pid:
+        return
+    
+    with _unoserver_lock:
+        if _unoserver_process is not None and _unoserver_process.poll() is None:
+            _unoserver_process.terminate()
+            try:
+                _unoserver_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _unoserver_process.kill()
+        _unoserver_process = None
+
+
+def _is_unoserver_running():
+    """Check whether the persistent LibreOffice server process is alive."""
+    if _unoserver_process is None:
+        return False
+    
+    if os.getpid() == _unoserver_owner_pid:
+        return _unoserver_process.poll() is None
+    
+    # In a worker forked after startup the server is not our child, so
+    # probe the PID instead of waiting on it.
+    try:
+        os.kill(_unoserver_process.pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _convert_with_unoserver(docx_path, pdf_path):
+    """
+    Convert using the warm LibreOffice server started by start_libreoffice_server.
+    
+    Args:
+        docx_path: Path to the DOCX file
+        pdf_path: Full path for output PDF
+    
+    Returns:
+        Tuple of (success: bool, pdf_path or error_message: str)
+    """
+    if not _is_unoserver_running():
+        return False, "unoserver not running"
+    
+    try:
+        from unoserver.client import UnoClient
+        
+        abs_docx_path = os.path.abspath(docx_path)
+        abs_pdf_path = os.path.abspath(pdf_path)
+        
+        client = UnoClient(server=UNOSERVER_HOST, port=UNOSERVER_PORT)
+        client.convert(inpath=abs_docx_path, outpath=abs_pdf_path, convert_to='pdf')
+        
+        if os.path.exists(abs_pdf_path):
+            return True, abs_pdf_path
+        
+        return False, "unoserver completed but PDF file not found"
+    
+    except ImportError:
+        return False, "unoserver library not available"
+    except Exception as e:
+        return False, f"unoserver error: {str(e)}"
+
+
 def _convert_with_libreoffice(docx_path, output_dir, pdf_filename):
     """
     Convert using LibreOffice headless mode.
@@ -84,15 +207,21 @@ def _convert_with_libreoffice(docx_path, output_dir, pdf_filename):
     Returns:
         Tuple of (success: bool, pdf_path or error_message: str)
     """
+    conversion_dir = None
     try:
         abs_docx_path = os.path.abspath(docx_path)
         abs_output_dir = os.path.abspath(output_dir)
         
+        # A private output directory per conversion makes the generated
+        # file name predictable and keeps concurrent conversions apart.
+        conversion_dir = os.path.join(abs_output_dir, f"convert_{uuid.uuid4().hex}")
+        os.makedirs(conversion_dir)
+        
         cmd = [
             'soffice',
             '--headless',
             '--convert-to', 'pdf',
-            '--outdir', abs_output_dir,
+            '--outdir', conversion_dir,
             abs_docx_path
         ]
         
@@ -105,19 +234,12 @@ def _convert_with_libreoffice(docx_path, output_dir, pdf_filename):
         
         if result.returncode == 0:
             base_name = os.path.splitext(os.path.basename(docx_path))[0]
-            generated_pdf = os.path.join(abs_output_dir, f"{base_name}.pdf")
+            generated_pdf = os.path.join(conversion_dir, f"{base_name}.pdf")
             
             if os.path.exists(generated_pdf):
                 final_path = os.path.join(abs_output_dir, pdf_filename)
                 os.rename(generated_pdf, final_path)
                 return True, final_path
-            
-            for f in os.listdir(abs_output_dir):
-                if f.endswith('.pdf') and base_name in f:
-                    generated_pdf = os.path.join(abs_output_dir, f)
-                    final_path = os.path.join(abs_output_dir, pdf_filename)
-                    os.rename(generated_pdf, final_path)
-                    return True, final_path
         
         return False, f"conversion failed: {result.stderr}"
     
@@ -127,16 +249,26 @@ def _convert_with_libreoffice(docx_path, output_dir, pdf_filename):
         return False, "LibreOffice not found"
     except Exception as e:
         return False, f"error: {str(e)}"
+    finally:
+        if conversion_dir:
+            shutil.rmtree(conversion_dir, ignore_errors=True)
 
 
+@functools.lru_cache(maxsize=1)
 def is_pdf_conversion_available():
-    """Check if any PDF conversion method is available."""
+    """
+    Check if any PDF conversion method is available.
+    The result is cached for the lifetime of the process.
+    """
     try:
         from docx2pdf import convert
         return True
     except ImportError:
         pass
     
+    if shutil.which('soffice') is None:
+        return False
+    
     try:
         result = subprocess.run(
             ['soffice', '--version'],